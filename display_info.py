@@ -1,29 +1,110 @@
-import win32api
-import win32con
+import ctypes
+from ctypes import wintypes
 import logging
+from PyQt5.QtGui import QGuiApplication
 
-# 配置日志记录
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class _MONITORINFOEXW(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", wintypes.DWORD),
+        ("rcMonitor", wintypes.RECT),
+        ("rcWork", wintypes.RECT),
+        ("dwFlags", wintypes.DWORD),
+        ("szDevice", wintypes.WCHAR * 32)
+    ]
+
+
+_MONITORENUMPROC = ctypes.WINFUNCTYPE(
+    wintypes.BOOL, wintypes.HMONITOR, wintypes.HDC, ctypes.POINTER(wintypes.RECT), wintypes.LPARAM
+)
+
+_user32 = ctypes.WinDLL("user32", use_last_error=True)
+_user32.EnumDisplayMonitors.argtypes = [
+    wintypes.HDC, ctypes.POINTER(wintypes.RECT), _MONITORENUMPROC, wintypes.LPARAM
+]
+_user32.EnumDisplayMonitors.restype = wintypes.BOOL
+_user32.GetMonitorInfoW.argtypes = [wintypes.HMONITOR, ctypes.POINTER(_MONITORINFOEXW)]
+_user32.GetMonitorInfoW.restype = wintypes.BOOL
+
+
+def _rect_tuple(rect):
+    return (rect.left, rect.top, rect.right, rect.bottom)
+
+
+def _monitor_dict(index, handle, position, work_area, device):
+    return {
+        "index": index,
+        "handle": handle,
+        "position": position,
+        "work_area": work_area,
+        "device": device,
+        "left": position[0],
+        "top": position[1],
+        "width": position[2] - position[0],
+        "height": position[3] - position[1]
+    }
 
 
 class DisplayInfo:
-    @staticmethod
-    def get_monitors():
+    # 显示器拓扑很少变化，缓存枚举结果，收到 WM_DISPLAYCHANGE 时失效
+    _cache = None
+
+    @classmethod
+    def get_monitors(cls):
         """获取所有显示器信息"""
+        if cls._cache is not None:
+            return list(cls._cache)
         monitors = []
         try:
-            for i, monitor in enumerate(win32api.EnumDisplayMonitors(None, None)):
-                monitor_info = win32api.GetMonitorInfo(monitor[0])
-                monitors.append({
-                    "index": i,
-                    "handle": monitor[0],
-                    "position": monitor_info["Monitor"],
-                    "work_area": monitor_info["Work"],
-                    "device": monitor_info["Device"]
-                })
+            # 已有 Qt 应用时直接使用 Qt 维护的屏幕列表，否则通过 Win32 枚举
+            if QGuiApplication.instance() is not None:
+                cls._enum_qt_monitors(monitors)
+            else:
+                cls._enum_win32_monitors(monitors)
         except Exception as e:
-            logging.error(f"获取显示器信息失败: {e}")
-        return monitors
+            logger.error(f"获取显示器信息失败: {e}")
+            return monitors
+        cls._cache = monitors
+        return list(monitors)
+
+    @staticmethod
+    def _enum_qt_monitors(monitors):
+        for screen in QGuiApplication.screens():
+            geometry = screen.geometry()
+            available = screen.availableGeometry()
+            monitors.append(_monitor_dict(
+                len(monitors),
+                None,
+                (geometry.left(), geometry.top(), geometry.right() + 1, geometry.bottom() + 1),
+                (available.left(), available.top(), available.right() + 1, available.bottom() + 1),
+                screen.name()
+            ))
+
+    @staticmethod
+    def _enum_win32_monitors(monitors):
+        def _on_monitor(hmonitor, hdc, lprect, lparam):
+            # 在同一次 EnumDisplayMonitors 调用内直接读取显示器信息
+            monitor_info = _MONITORINFOEXW()
+            monitor_info.cbSize = ctypes.sizeof(_MONITORINFOEXW)
+            if _user32.GetMonitorInfoW(hmonitor, ctypes.byref(monitor_info)):
+                monitors.append(_monitor_dict(
+                    len(monitors),
+                    hmonitor,
+                    _rect_tuple(monitor_info.rcMonitor),
+                    _rect_tuple(monitor_info.rcWork),
+                    monitor_info.szDevice
+                ))
+            return True
+
+        if not _user32.EnumDisplayMonitors(None, None, _MONITORENUMPROC(_on_monitor), 0):
+            raise ctypes.WinError(ctypes.get_last_error())
+
+    @classmethod
+    def invalidate_cache(cls):
+        """清除显示器信息缓存"""
+        cls._cache = None
 
     @staticmethod
     def get_monitor_info_text():
@@ -34,6 +115,6 @@ class DisplayInfo:
             info.append(
                 f"屏幕 {monitor['index'] + 1} ({monitor['device']}):\n"
                 f"  位置: 左={pos[0]}, 上={pos[1]}, 右={pos[2]}, 下={pos[3]}\n"
-                f"  分辨率: {pos[2] - pos[0]}x{pos[3] - pos[1]}"
+                f"  分辨率: {monitor['width']}x{monitor['height']}"
             )
         return "\n\n".join(info)
\ No newline at end of file
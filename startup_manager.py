@@ -1,14 +1,14 @@
 import os
-import winshell
 import logging
 
-# 配置日志记录
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
 
 
 class StartupManager:
     def __init__(self):
-        self.startup_folder = winshell.startup()
+        import winshell
+        self._winshell = winshell
+        self.startup_folder = self._winshell.startup()
         self.shortcut_name = "MultiScreenVideoPlayer.lnk"
 
     def enable_startup(self):
@@ -17,14 +17,19 @@ class StartupManager:
             import sys
             script_path = os.path.abspath(sys.argv[0])
             shortcut_path = os.path.join(self.startup_folder, self.shortcut_name)
+            if os.path.exists(shortcut_path):
+                # 快捷方式已指向当前程序时不再重写（不使用 with，避免退出时保存）
+                existing = self._winshell.shortcut(shortcut_path)
+                if os.path.normcase(existing.path) == os.path.normcase(script_path):
+                    return True
 
-            with winshell.shortcut(shortcut_path) as shortcut:
+            with self._winshell.shortcut(shortcut_path) as shortcut:
                 shortcut.path = script_path
                 shortcut.description = "多屏视频播放器开机自启"
                 shortcut.working_directory = os.path.dirname(script_path)
             return True
         except Exception as e:
-            logging.error(f"启用开机自启失败: {e}")
+            logger.error(f"启用开机自启失败: {e}")
             return False
 
     def disable_startup(self):
@@ -36,7 +41,7 @@ class StartupManager:
                 return True
             return False
         except Exception as e:
-            logging.error(f"禁用开机自启失败: {e}")
+            logger.error(f"禁用开机自启失败: {e}")
             return False
 
     def is_startup_enabled(self):
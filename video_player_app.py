@@ -1,31 +1,96 @@
 import os
 import json
 import sys
-import time
+import queue
+import atexit
+import logging
+import logging.handlers
+import textwrap
+import ctypes.wintypes
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton,
     QFileDialog, QMessageBox, QLabel
 )
-from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve
-from PyQt5.QtGui import QCloseEvent, QFont, QPalette, QColor, QIcon
+from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QSize
+from PyQt5.QtGui import QCloseEvent, QIcon
 from display_info import DisplayInfo
 from vlc_controller import VLCController
 from startup_manager import StartupManager
 
+WM_SETTINGCHANGE = 0x001A
+WM_DISPLAYCHANGE = 0x007E
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_settings(settings):
+    """序列化设置为 bytes，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(settings)
+    return json.dumps(settings, separators=(',', ':')).encode('utf-8')
+
+
+def loads_settings(data):
+    """从 bytes 解析设置，orjson.JSONDecodeError 是 json.JSONDecodeError 的子类"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def setup_logging():
+    """配置日志：记录先放入队列，由后台线程统一写出，调用方线程不直接执行写操作"""
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # 不经 basicConfig 挂载，QueueHandler 不带格式化器，格式只由 handler 决定
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(queue_handler)
+    listener.start()
+    # 退出时写出队列中剩余的记录
+    atexit.register(listener.stop)
+
 
 class VideoPlayerApp(QWidget):
+    # 样式表在类定义时构建一次，去掉多余缩进
+    _STYLESHEET = textwrap.dedent("""
+        QWidget {
+            background-color: #2c3e50;
+            color: #ecf0f1;
+        }
+        QPushButton {
+            background-color: #3498db;
+            border: 2px solid #2980b9;
+            border-radius: 5px;
+            padding: 10px;
+            min-width: 120px;
+        }
+        QPushButton:hover {
+            background-color: #2980b9;
+        }
+        QPushButton:pressed {
+            background-color: #1c6ca7;
+        }
+        QLabel {
+            font-size: 14px;
+            padding: 5px;
+        }
+    """).strip()
+
     def __init__(self):
         super().__init__()
         self.vlc = VLCController()
         self.startup_manager = StartupManager()
         self.video_files = []
         self.is_loop_play = False
-        self.continue_playback = True
-        self.timer = None
+        self._last_saved_hash = None
         self.init_ui()
-        self.current_monitor_index = 0
         self.load_settings()
-        self.setup_button_animations()
 
     def init_ui(self):
         self.setWindowTitle("多屏视频播放系统")
@@ -33,29 +98,7 @@ class VideoPlayerApp(QWidget):
         self.setFixedSize(600, 950)
 
         # 样式设置
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #2c3e50;
-                color: #ecf0f1;
-            }
-            QPushButton {
-                background-color: #3498db;
-                border: 2px solid #2980b9;
-                border-radius: 5px;
-                padding: 10px;
-                min-width: 120px;
-            }
-            QPushButton:hover {
-                background-color: #2980b9;
-            }
-            QPushButton:pressed {
-                background-color: #1c6ca7;
-            }
-            QLabel {
-                font-size: 14px;
-                padding: 5px;
-            }
-        """)
+        self.setStyleSheet(self._STYLESHEET)
 
         # 布局设置
         main_layout = QVBoxLayout()
@@ -84,7 +127,9 @@ class VideoPlayerApp(QWidget):
 
         for text, handler in controls:
             btn = QPushButton(text)
-            btn.clicked.connect(handler)
+            self.setup_button_animation(btn)
+            # 点击动画与处理函数共用一个连接
+            btn.clicked.connect(lambda _, h=handler, b=btn: (self.button_click_animation(b), h()))
             main_layout.addWidget(btn)
 
         # 显示当前播放模式的标签
@@ -94,27 +139,22 @@ class VideoPlayerApp(QWidget):
 
         self.setLayout(main_layout)
 
-    def setup_button_animations(self):
-        # 按钮点击动画
-        for button in self.findChildren(QPushButton):
-            button.clicked.connect(lambda _, btn=button: self.button_click_animation(btn))
-
-    def button_click_animation(self, button):
-        # 按钮点击动画，改变按钮大小
-        animation = QPropertyAnimation(button, b'size')
-        animation.setDuration(100)
-        animation.setStartValue(button.size())
-        animation.setEndValue(button.size() * 0.9)
+    def setup_button_animation(self, button):
+        # 按钮点击动画，每个按钮只创建一次动画对象
+        animation = QPropertyAnimation(button, b'size', button)
+        animation.setDuration(200)
         animation.setEasingCurve(QEasingCurve.InOutQuad)
-        animation.finished.connect(lambda: self.restore_button_size(button))
-        animation.start()
+        button._anim = animation
 
-    def restore_button_size(self, button):
-        animation = QPropertyAnimation(button, b'size')
-        animation.setDuration(100)
-        animation.setStartValue(button.size())
-        animation.setEndValue(button.size() / 0.9)
-        animation.setEasingCurve(QEasingCurve.InOutQuad)
+    def button_click_animation(self, button):
+        # 按钮点击动画，先缩小再恢复原始大小
+        animation = button._anim
+        if animation.state() == QPropertyAnimation.Running:
+            return
+        size = button.size()
+        animation.setStartValue(size)
+        animation.setKeyValueAt(0.5, QSize(int(size.width() * 0.9), int(size.height() * 0.9)))
+        animation.setEndValue(size)
         animation.start()
 
     def select_video(self):
@@ -126,7 +166,7 @@ class VideoPlayerApp(QWidget):
         if files:
             self.video_files = files
             self.status_label.setText(f"已选择 {len(files)} 个视频文件")
-            self.save_settings()
+            self.save_settings(silent=True)
 
     def start_playback(self):
         """开始播放"""
@@ -139,29 +179,21 @@ class VideoPlayerApp(QWidget):
                 QMessageBox.warning(self, "警告",
                                     f"视频文件数量 ({len(self.video_files)}) 少于显示器数量 ({len(monitors)})")
                 return
-            self.vlc.stop_all()
-            self.current_monitor_index = 0
-            self.monitors = monitors
-            self.start_next_playback()
+            # 已在播放的显示器由 VLC 直接切换视频，无需先停止
+            self.start_all_playback(monitors)
             self.status_label.setText(f"正在 {len(monitors)} 个屏幕上播放")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"播放失败: {str(e)}")
             self.status_label.setText("播放出错")
 
-    def start_next_playback(self):
-        if not self.continue_playback:
-            return
-        if self.current_monitor_index < len(self.monitors):
-            monitor = self.monitors[self.current_monitor_index]
-            video_path = self.video_files[self.current_monitor_index]
-            if not self.vlc.start_vlc_instance(video_path, monitor):
-                QMessageBox.critical(self, "错误", f"屏幕 {self.current_monitor_index + 1} 播放失败")
-            self.current_monitor_index += 1
-            self.timer = QTimer.singleShot(1000, self.start_next_playback)
-        elif self.is_loop_play:
-            self.current_monitor_index = 0
-            self.vlc.stop_all()
-            self.timer = QTimer.singleShot(1000, self.start_next_playback)
+    def start_all_playback(self, monitors):
+        # 各屏幕的 VLC 相互独立，一次性全部启动；循环播放交给 VLC 自身处理
+        jobs = [(self.video_files[i], monitor, self.is_loop_play) for i, monitor in enumerate(monitors)]
+        self.vlc.prevalidate(job[0] for job in jobs)
+        results = self.vlc.start_many(jobs)
+        failed = [str(i + 1) for i, ok in enumerate(results) if not ok]
+        if failed:
+            QMessageBox.critical(self, "错误", f"屏幕 {', '.join(failed)} 播放失败")
 
     def stop_playback(self):
         """停止播放"""
@@ -202,41 +234,50 @@ class VideoPlayerApp(QWidget):
                     new_video_files.append("")
             self.video_files = new_video_files
             QMessageBox.information(self, "提示", f"已为 {len(self.video_files)} 个屏幕分配视频文件")
-            self.save_settings()
+            self.save_settings(silent=True)
 
     def detect_screen_info(self):
         monitor_info = DisplayInfo.get_monitors()
-        info_text = ""
+        parts = []
         for i, monitor in enumerate(monitor_info):
-            monitor_rect = monitor["position"]
-            width = monitor_rect[2] - monitor_rect[0]
-            height = monitor_rect[3] - monitor_rect[1]
-            left = monitor_rect[0]
-            top = monitor_rect[1]
-            info_text += f"屏幕 {i + 1}：\n"
-            info_text += f"  位置：左 {left}，上 {top}\n"
-            info_text += f"  分辨率：{width} x {height}\n"
-        QMessageBox.information(self, "屏幕信息", info_text)
-
-    def save_settings(self):
+            parts.append(
+                f"屏幕 {i + 1}：\n"
+                f"  位置：左 {monitor['left']}，上 {monitor['top']}\n"
+                f"  分辨率：{monitor['width']} x {monitor['height']}\n"
+            )
+        QMessageBox.information(self, "屏幕信息", "".join(parts))
+
+    def settings_data(self):
+        settings = {
+            "video_files": self.video_files,
+            "is_loop_play": self.is_loop_play
+        }
+        return dumps_settings(settings)
+
+    def save_settings(self, silent=False):
+        """保存设置，内容未变化时跳过写盘；silent 为 True 时不弹出提示"""
         try:
-            settings = {
-                "video_files": self.video_files,
-                "is_loop_play": self.is_loop_play
-            }
-            with open('settings.json', 'w') as f:
-                json.dump(settings, f)
-            QMessageBox.information(self, "提示", "设置已保存。")
+            data = self.settings_data()
+            data_hash = hash(data)
+            if data_hash != self._last_saved_hash:
+                # 先写临时文件再替换，避免写入中断导致设置文件损坏
+                with open('settings.json.tmp', 'wb') as f:
+                    f.write(data)
+                os.replace('settings.json.tmp', 'settings.json')
+                self._last_saved_hash = data_hash
+            if not silent:
+                QMessageBox.information(self, "提示", "设置已保存。")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"保存设置时出现错误: {str(e)}")
 
     def load_settings(self):
         try:
-            with open('settings.json', 'r') as f:
-                settings = json.load(f)
+            with open('settings.json', 'rb') as f:
+                settings = loads_settings(f.read())
                 self.video_files = settings.get("video_files", [])
                 self.is_loop_play = settings.get("is_loop_play", False)
                 self.update_mode_label()
+                self._last_saved_hash = hash(self.settings_data())
         except FileNotFoundError:
             self.video_files = []
             self.is_loop_play = False
@@ -255,7 +296,7 @@ class VideoPlayerApp(QWidget):
             if os.path.exists(file_path):
                 self.video_files = [file_path]
                 QMessageBox.information(self, "提示", f"已选择视频文件: {file_path}")
-                self.save_settings()
+                self.save_settings(silent=True)
             else:
                 QMessageBox.critical(self, "错误", f"选择的文件 {file_path} 不存在。")
 
@@ -263,7 +304,7 @@ class VideoPlayerApp(QWidget):
         """切换播放模式"""
         self.is_loop_play = not self.is_loop_play
         self.update_mode_label()
-        self.save_settings()
+        self.save_settings(silent=True)
 
     def get_mode_text(self):
         return f"当前播放模式: {'循环播放' if self.is_loop_play else '普通播放'}"
@@ -271,20 +312,22 @@ class VideoPlayerApp(QWidget):
     def update_mode_label(self):
         self.mode_label.setText(self.get_mode_text())
 
+    def nativeEvent(self, eventType, message):
+        # 显示器拓扑或系统设置变化时，清除显示器信息缓存
+        if eventType == b"windows_generic_MSG":
+            msg = ctypes.wintypes.MSG.from_address(int(message))
+            if msg.message in (WM_DISPLAYCHANGE, WM_SETTINGCHANGE):
+                DisplayInfo.invalidate_cache()
+        return super().nativeEvent(eventType, message)
+
     def closeEvent(self, event: QCloseEvent):
-        self.vlc.stop_all()
-        self.continue_playback = False
-        if self.timer:
-            try:
-                self.timer.stop()
-            except Exception as e:
-                print(f"停止定时器时出错: {e}")
-        # 等待一段时间，确保 VLC 进程完全终止
-        time.sleep(1)
+        # 关闭窗口时只做短暂等待，未退出的 VLC 进程直接强制结束
+        self.vlc.stop_all(timeout=0.2)
         event.accept()
 
 
 if __name__ == "__main__":
+    setup_logging()
     app = QApplication(sys.argv)
     window = VideoPlayerApp()
     window.show()
@@ -1,77 +1,445 @@
 import os
+import errno
+import array
+import ctypes
+from ctypes import wintypes
+import shutil
+import socket
 import subprocess
 import time
 import logging
+import functools
+import threading
+import winreg
+import _winapi
+from concurrent.futures import ThreadPoolExecutor
 
-# 配置日志记录
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# 日志由应用程序统一配置（见 video_player_app.setup_logging）
+logger = logging.getLogger(__name__)
+
+
+_kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+_kernel32.CreateJobObjectW.argtypes = [ctypes.c_void_p, wintypes.LPCWSTR]
+_kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+_kernel32.AssignProcessToJobObject.argtypes = [wintypes.HANDLE, wintypes.HANDLE]
+_kernel32.AssignProcessToJobObject.restype = wintypes.BOOL
+_kernel32.TerminateJobObject.argtypes = [wintypes.HANDLE, wintypes.UINT]
+_kernel32.TerminateJobObject.restype = wintypes.BOOL
+_kernel32.SetProcessAffinityMask.argtypes = [wintypes.HANDLE, ctypes.c_size_t]
+_kernel32.SetProcessAffinityMask.restype = wintypes.BOOL
+
+_ERROR_INSUFFICIENT_BUFFER = 122
+_TCP_TABLE_OWNER_PID_LISTENER = 3
+
+
+class _MIB_TCPROW_OWNER_PID(ctypes.Structure):
+    _fields_ = [
+        ("dwState", wintypes.DWORD),
+        ("dwLocalAddr", wintypes.DWORD),
+        ("dwLocalPort", wintypes.DWORD),
+        ("dwRemoteAddr", wintypes.DWORD),
+        ("dwRemotePort", wintypes.DWORD),
+        ("dwOwningPid", wintypes.DWORD)
+    ]
+
+
+_iphlpapi = ctypes.WinDLL("iphlpapi")
+_iphlpapi.GetExtendedTcpTable.argtypes = [
+    ctypes.c_void_p, ctypes.POINTER(wintypes.DWORD), wintypes.BOOL, wintypes.ULONG, ctypes.c_int, wintypes.ULONG
+]
+_iphlpapi.GetExtendedTcpTable.restype = wintypes.DWORD
+
+
+# 播放状态编码，与 VLCController.processes 按下标一一对应
+_STATUS_PLAYING = 0
+_STATUS_EXITED = 1
+_STATUS_NAMES = ("playing", "exited")
+
+
+@functools.lru_cache(maxsize=1)
+def _find_vlc():
+    """查找VLC安装路径，结果在进程内缓存"""
+    try:
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"Software\VideoLAN\VLC") as key:
+            install_dir, _ = winreg.QueryValueEx(key, "InstallDir")
+        path = os.path.join(install_dir, "vlc.exe")
+        if os.path.exists(path):
+            return os.path.normpath(path)
+    except OSError:
+        pass
+    possible_dirs = [
+        r"C:\Program Files\VideoLAN\VLC",
+        r"C:\Program Files (x86)\VideoLAN\VLC",
+        os.path.expanduser("~\\AppData\\Local\\VLC")
+    ]
+    for directory in possible_dirs:
+        # 目录项自带文件属性，is_file 不需要额外的系统调用
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.lower() == "vlc.exe" and entry.is_file(follow_symlinks=False):
+                        return os.path.normpath(entry.path)
+        except OSError:
+            continue
+    path = shutil.which("vlc")
+    if path:
+        return os.path.normpath(path)
+    raise FileNotFoundError("VLC未找到，请手动指定路径")
+
+
+def _affinity_mask(index, count):
+    """把 CPU 核心平均分给 count 个 VLC 实例，返回第 index 个实例的亲和性掩码"""
+    # 单个掩码最多表示 64 个逻辑处理器（一个处理器组）
+    cores = min(os.cpu_count() or 1, ctypes.sizeof(ctypes.c_size_t) * 8)
+    if count >= cores:
+        # 实例数不少于核心数时每个实例一个核心，轮流分配
+        return 1 << (index % cores)
+    # 除不尽的核心依次多分给前面的实例，保证所有核心都被用上
+    per_instance, extra = divmod(cores, count)
+    first = index * per_instance + min(index, extra)
+    size = per_instance + (1 if index < extra else 0)
+    return ((1 << size) - 1) << first
+
+
+def _free_port():
+    """获取一个当前空闲的本地端口，供 VLC 的 RC 接口监听"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _listening_pid(port):
+    """返回在本地 IPv4 TCP 端口上监听的进程号，没有进程监听时返回 None"""
+    size = wintypes.DWORD(0)
+    while True:
+        buf = ctypes.create_string_buffer(size.value)
+        result = _iphlpapi.GetExtendedTcpTable(
+            buf, ctypes.byref(size), False, socket.AF_INET, _TCP_TABLE_OWNER_PID_LISTENER, 0
+        )
+        # 两次调用之间连接表可能变大，缓冲区不足时按新的大小重试
+        if result != _ERROR_INSUFFICIENT_BUFFER:
+            break
+    if result != 0:
+        raise ctypes.WinError(result)
+    count = wintypes.DWORD.from_buffer(buf).value
+    rows = (_MIB_TCPROW_OWNER_PID * count).from_buffer(buf, ctypes.sizeof(wintypes.DWORD))
+    for row in rows:
+        if socket.ntohs(row.dwLocalPort & 0xFFFF) == port:
+            return row.dwOwningPid
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def _validated_path(video_path):
+    """检查视频文件是否存在并返回规范化路径，只缓存存在的路径"""
+    if not os.path.exists(video_path):
+        # 消息在异常被转成字符串时才拼接，并填充 filename 属性
+        raise FileNotFoundError(errno.ENOENT, "视频文件不存在", video_path)
+    return os.path.normpath(video_path)
 
 
 class VLCController:
-    def __init__(self, vlc_path=None):
-        self.logger = logging.getLogger(__name__)
+    def __init__(self, vlc_path=None, capture_output=False, pin_cpus=False):
         self.vlc_path = vlc_path or self.find_vlc()
+        # 默认丢弃 VLC 的输出；capture_output 为 True 时由后台线程读取并写入日志
+        self.capture_output = capture_output
+        # pin_cpus 为 True 时 start_many 把 CPU 核心分给各个 VLC 实例
+        self.pin_cpus = pin_cpus
+        # 与显示器和视频无关的固定参数只构建一次；
+        # 播放墙不需要操作界面，使用 dummy 界面避免每个进程都加载 Qt 界面
+        self._argv_prefix = (
+            self.vlc_path,
+            "--intf=dummy",
+            "--dummy-quiet",
+            "--quiet",
+            "--no-one-instance",
+            "--no-video-deco",
+            "--no-embedded-video",
+            "--no-video-title-show",
+            "--fullscreen"
+        )
+        # 固定部分预先转成命令行字符串，启动时只需拼接每次变化的参数
+        self._prefix_cmdline = subprocess.list2cmdline(self._argv_prefix)
+        self._lock = threading.Lock()
+        # prevalidate 确认存在的视频路径
+        self._valid_paths = set()
+        # 所有 VLC 进程放入同一个作业对象，停止时一次调用即可全部结束
+        self._job = _kernel32.CreateJobObjectW(None, None)
+        if not self._job:
+            logger.error(f"创建作业对象失败: {ctypes.WinError(ctypes.get_last_error())}")
+        self._clear_processes()
+
+    def _clear_processes(self):
+        # 进程、启动时间和状态分别存放在按下标对齐的数组中
         self.processes = []
-        self.playback_status = {}
+        # 启动时刻记为 time.monotonic_ns() 的整数值
+        self._start_ns = array.array('q')
+        self._statuses = bytearray()
+        self._all_in_job = self._job is not None
+        # 每个显示器区域对应一个常驻的 VLC：{(left, top, width, height): {"process", "port", "sock"}}
+        self._instances = {}
+        # 已分配但对应 VLC 尚未登记的 RC 端口
+        self._pending_ports = set()
+
+    def _refresh_statuses(self):
+        """把已自行退出的播放中进程标记为 exited，调用方需持有 self._lock"""
+        for i, p in enumerate(self.processes):
+            if self._statuses[i] == _STATUS_PLAYING and p.poll() is not None:
+                self._statuses[i] = _STATUS_EXITED
+
+    @property
+    def playback_status(self):
+        """按进程号返回播放状态，保持原来的字典结构"""
+        with self._lock:
+            self._refresh_statuses()
+            now, now_ns = time.time(), time.monotonic_ns()
+            return {
+                p.pid: {"start_time": now - (now_ns - start_ns) / 1e9, "status": _STATUS_NAMES[status]}
+                for p, start_ns, status in zip(self.processes, self._start_ns, self._statuses)
+            }
+
+    def uptime(self, pid):
+        """返回指定 VLC 进程已播放的整秒数，进程已不在播放时返回 None"""
+        with self._lock:
+            self._refresh_statuses()
+            for i, p in enumerate(self.processes):
+                if p.pid == pid:
+                    if self._statuses[i] != _STATUS_PLAYING:
+                        return None
+                    return (time.monotonic_ns() - self._start_ns[i]) // 1_000_000_000
+        raise KeyError(pid)
 
     def find_vlc(self):
         """自动查找VLC安装路径"""
-        possible_paths = [
-            r"C:\Program Files\VideoLAN\VLC\vlc.exe",
-            r"C:\Program Files (x86)\VideoLAN\VLC\vlc.exe",
-            os.path.expanduser("~\\AppData\\Local\\VLC\\vlc.exe")
-        ]
-        for path in possible_paths:
-            if os.path.exists(path):
-                return os.path.normpath(path)
-        raise FileNotFoundError("VLC未找到，请手动指定路径")
+        return _find_vlc()
+
+    def prevalidate(self, paths):
+        """批量确认视频文件存在：每个目录只扫描一次，返回存在的路径集合"""
+        by_dir = {}
+        for path in paths:
+            if path:
+                by_dir.setdefault(os.path.dirname(path), []).append(path)
+        found = set()
+        for directory, dir_paths in by_dir.items():
+            self._valid_paths.difference_update(dir_paths)
+            try:
+                with os.scandir(directory or ".") as entries:
+                    names = {os.path.normcase(entry.name) for entry in entries if entry.is_file()}
+            except OSError:
+                continue
+            found.update(p for p in dir_paths if os.path.normcase(os.path.basename(p)) in names)
+        self._valid_paths |= found
+        return found
+
+    def _validate_path(self, video_path):
+        if video_path in self._valid_paths:
+            return os.path.normpath(video_path)
+        return _validated_path(video_path)
 
-    def build_command(self, video_path, monitor_info):
+    def build_command(self, video_path, monitor_info, loop=False, rc_port=None):
         """构建VLC命令行参数"""
-        if not os.path.exists(video_path):
-            raise FileNotFoundError(f"视频文件不存在: {video_path}")
-        monitor = monitor_info["position"]
-        width = monitor[2] - monitor[0]
-        height = monitor[3] - monitor[1]
-        video_path = os.path.normpath(video_path)
-        self.logger.info(f"使用的视频路径: {video_path}")
+        return [*self._argv_prefix, *self._command_args(video_path, monitor_info, loop, rc_port)]
+
+    def build_command_line(self, video_path, monitor_info, loop=False, rc_port=None):
+        """构建VLC命令行字符串，固定部分使用预先生成的字符串"""
+        args = self._command_args(video_path, monitor_info, loop, rc_port)
+        return f"{self._prefix_cmdline} {subprocess.list2cmdline(args)}"
+
+    def _command_args(self, video_path, monitor_info, loop, rc_port):
+        video_path = self._validate_path(video_path)
+        logger.info("使用的视频路径: %s", video_path)
+        # 显式指定每个实例的位置和尺寸，使多个 VLC 分别铺在各自的显示器上
         return [
-            self.vlc_path,
-            "--fullscreen",
+            f"--video-x={monitor_info['left']}",
+            f"--video-y={monitor_info['top']}",
+            f"--width={monitor_info['width']}",
+            f"--height={monitor_info['height']}",
+            *(("--loop",) if loop else ()),
+            *(("--extraintf=rc", "--rc-quiet", f"--rc-host=127.0.0.1:{rc_port}") if rc_port else ()),
             video_path
         ]
 
-    def start_vlc_instance(self, video_path, monitor_info):
-        """启动VLC实例"""
+    def _switch_video(self, key, video_path, loop):
+        """该显示器上已有运行中的 VLC 时，通过 RC 接口切换视频，成功返回 True"""
+        instance = self._instances.get(key)
+        if instance is None:
+            return False
+        if instance["process"].poll() is not None:
+            # 已退出的 VLC 不再复用，移除后由调用方重新启动
+            self._discard_instance(key)
+            return False
+        try:
+            video_path = self._validate_path(video_path)
+        except OSError:
+            # 新视频无效时关闭该显示器上的 VLC，避免继续播放旧视频而界面提示播放失败
+            self._discard_instance(key)
+            raise
+        try:
+            if instance["sock"] is None:
+                sock = socket.create_connection(("127.0.0.1", instance["port"]), timeout=1)
+                # 确认 RC 端口确实由该显示器上的 VLC 监听，避免控制到其他显示器的播放器
+                if _listening_pid(instance["port"]) != instance["process"].pid:
+                    sock.close()
+                    raise OSError(f"RC 端口 {instance['port']} 不属于进程 {instance['process'].pid}")
+                instance["sock"] = sock
+            sock = instance["sock"]
+            # 丢弃之前命令的回显，避免 VLC 一侧的发送缓冲区被写满
+            sock.setblocking(False)
+            try:
+                while sock.recv(4096):
+                    pass
+            except BlockingIOError:
+                pass
+            sock.settimeout(1)
+            sock.sendall(f"clear\nadd {video_path}\nloop {'on' if loop else 'off'}\n".encode('utf-8'))
+        except OSError as e:
+            logger.error(f"通过 RC 接口切换视频失败，将重新启动 VLC: {e}")
+            self._discard_instance(key)
+            return False
+        with self._lock:
+            index = self.processes.index(instance["process"])
+            self._start_ns[index] = time.monotonic_ns()
+        return True
+
+    def _discard_instance(self, key):
+        """关闭无法继续使用的常驻 VLC"""
+        # 其他线程会在持锁时遍历 self._instances，移除也必须持锁
+        with self._lock:
+            instance = self._instances.pop(key)
+            self._remove_process(instance["process"])
+        if instance["sock"] is not None:
+            instance["sock"].close()
         try:
-            cmd = self.build_command(video_path, monitor_info)
-            self.logger.info(f"启动VLC命令: {' '.join(cmd)}")
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            stdout, stderr = process.communicate()
-            if stdout:
-                self.logger.info(f"VLC 标准输出: {stdout.decode('utf-8', errors='ignore')}")
-            if stderr:
-                self.logger.error(f"VLC 标准错误: {stderr.decode('utf-8', errors='ignore')}")
-            self.processes.append(process)
-            self.playback_status[process.pid] = {
-                "start_time": time.time(),
-                "status": "playing"
-            }
+            instance["process"].terminate()
+        except Exception as e:
+            logger.error(f"终止 VLC 进程失败: {e}")
+
+    def _remove_process(self, process):
+        """从按下标对齐的数组中删除一个进程的记录，调用方需持有 self._lock"""
+        index = self.processes.index(process)
+        del self.processes[index]
+        del self._start_ns[index]
+        del self._statuses[index]
+
+    def _allocate_port(self):
+        """分配 RC 端口；端口释放后到 VLC 监听前可能被再次分到，因此排除已分配给其他实例的端口"""
+        with self._lock:
+            used = self._pending_ports | {instance["port"] for instance in self._instances.values()}
+            port = _free_port()
+            while port in used:
+                port = _free_port()
+            self._pending_ports.add(port)
+            return port
+
+    @staticmethod
+    def _instance_key(monitor_info):
+        return (monitor_info['left'], monitor_info['top'], monitor_info['width'], monitor_info['height'])
+
+    def start_vlc_instance(self, video_path, monitor_info, loop=False):
+        """启动VLC实例；该显示器上已有 VLC 时直接切换视频，不再新建进程"""
+        key = self._instance_key(monitor_info)
+        rc_port = None
+        try:
+            if self._switch_video(key, video_path, loop):
+                return True
+            rc_port = self._allocate_port()
+            cmd = self.build_command_line(video_path, monitor_info, loop, rc_port)
+            logger.info("启动VLC命令: %s", cmd)
+            # 不等待进程结束，多个屏幕的 VLC 才能同时播放
+            output = subprocess.PIPE if self.capture_output else subprocess.DEVNULL
+            process = subprocess.Popen(
+                cmd,
+                stdout=output,
+                stderr=output,
+                close_fds=True,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+            affinity = monitor_info.get("affinity")
+            if affinity and not _kernel32.SetProcessAffinityMask(int(process._handle), affinity):
+                logger.error(f"设置 VLC 进程 CPU 亲和性失败: {ctypes.WinError(ctypes.get_last_error())}")
+            if self._job and not _kernel32.AssignProcessToJobObject(self._job, int(process._handle)):
+                logger.error(f"VLC 进程加入作业对象失败: {ctypes.WinError(ctypes.get_last_error())}")
+                self._all_in_job = False
+            if self.capture_output:
+                for stream, level in ((process.stdout, logging.INFO), (process.stderr, logging.ERROR)):
+                    threading.Thread(target=self._drain_output, args=(stream, level), daemon=True).start()
+            with self._lock:
+                self.processes.append(process)
+                self._start_ns.append(time.monotonic_ns())
+                self._statuses.append(_STATUS_PLAYING)
+                self._instances[key] = {"process": process, "port": rc_port, "sock": None}
             return True
         except Exception as e:
-            self.logger.error(f"启动VLC失败: {str(e)}")
+            logger.error(f"启动VLC失败: {str(e)}")
             return False
+        finally:
+            if rc_port is not None:
+                with self._lock:
+                    self._pending_ports.discard(rc_port)
+
+    def _drain_output(self, stream, level):
+        """逐行读取 VLC 的输出并写入日志，直到进程关闭该管道"""
+        with stream:
+            for line in stream:
+                # 日志级别被过滤时不解码输出内容
+                if logger.isEnabledFor(level):
+                    logger.log(level, "VLC 输出: %s", line.decode('utf-8', errors='ignore').rstrip())
+
+    def start_many(self, jobs):
+        """并行启动多个VLC实例，jobs 为 start_vlc_instance 的参数元组列表，返回各自是否成功"""
+        jobs = list(jobs)
+        # 不在本次显示器区域中的常驻 VLC（显示器已移除或布局、分辨率已变化）先关闭，避免重复播放
+        keys = {self._instance_key(job[1]) for job in jobs}
+        for key in [key for key in self._instances if key not in keys]:
+            self._discard_instance(key)
+        if not jobs:
+            return []
+        if self.pin_cpus:
+            # 未指定 affinity 的显示器各分到一组不重叠的 CPU 核心，减少解码线程跨核迁移
+            jobs = [
+                (job[0], {"affinity": _affinity_mask(i, len(jobs)), **job[1]}, *job[2:])
+                for i, job in enumerate(jobs)
+            ]
+        # 创建进程时会释放 GIL，用线程即可让多个进程的创建过程重叠
+        with ThreadPoolExecutor(max_workers=min(len(jobs), 8)) as executor:
+            return list(executor.map(lambda job: self.start_vlc_instance(*job), jobs))
 
-    def stop_all(self):
+    def _wait_processes(self, processes, timeout):
+        """用 WaitForMultipleObjects 一次等待一批进程退出，返回超时后仍在运行的进程"""
+        deadline = time.monotonic() + timeout
+        pending = [p for p in processes if p.poll() is None]
+        # 单次等待的句柄数有上限（MAXIMUM_WAIT_OBJECTS），按批等待
+        for i in range(0, len(pending), 60):
+            batch = pending[i:i + 60]
+            remaining = max(0, deadline - time.monotonic())
+            try:
+                _winapi.WaitForMultipleObjects([p._handle for p in batch], True, int(remaining * 1000))
+            except OSError as e:
+                logger.error(f"等待 VLC 进程退出失败: {e}")
+        return [p for p in pending if p.poll() is None]
+
+    def _terminate_job(self):
+        if _kernel32.TerminateJobObject(self._job, 1):
+            return True
+        logger.error(f"结束作业对象失败: {ctypes.WinError(ctypes.get_last_error())}")
+        return False
+
+    def stop_all(self, timeout=5):
         """停止所有VLC进程"""
-        for p in self.processes:
+        for instance in self._instances.values():
+            if instance["sock"] is not None:
+                instance["sock"].close()
+        # 结束所有进程并统一等待，总等待时间不超过 timeout；
+        # 全部进程都在作业对象中时只需一次 TerminateJobObject
+        if not (self._all_in_job and self.processes and self._terminate_job()):
+            for p in self.processes:
+                try:
+                    p.terminate()
+                except Exception as e:
+                    logger.error(f"终止 VLC 进程失败: {e}")
+        for p in self._wait_processes(self.processes, timeout):
             try:
-                p.terminate()
-                p.wait(timeout=5)
+                p.kill()
             except Exception as e:
-                try:
-                    p.kill()
-                except Exception as e2:
-                    self.logger.error(f"强制终止 VLC 进程失败: {e2}")
-        self.processes = []
-        self.playback_status = {}
\ No newline at end of file
+                logger.error(f"强制终止 VLC 进程失败: {e}")
+        self._clear_processes()
\ No newline at end of file